@@ -1,23 +1,62 @@
 import sys
 import pyaudio
-import wave
 import numpy as np
 import threading
 import queue
 import requests
 import time
-import os
 import json
-import whisper
-import tempfile
-from collections import deque
-from pynput import keyboard
+import math
+import re
+from collections import deque, OrderedDict
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
                              QWidget, QLabel, QPushButton, QColorDialog,
                              QFontDialog, QGroupBox, QComboBox, QMessageBox,
-                             QSlider, QMenu, QDialog, QCheckBox, QTextEdit, QLineEdit, QInputDialog)
+                             QSlider, QMenu, QDialog, QCheckBox, QTextEdit, QLineEdit, QInputDialog,
+                             QShortcut)
 from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTimer
-from PyQt5.QtGui import QFont, QColor, QPalette, QCursor
+from PyQt5.QtGui import QFont, QColor, QPalette, QCursor, QKeySequence
+from whisper_proc import WhisperProcess
+
+# 全局快捷键（窗口无焦点时也生效）；pynput不可用时退回到Qt快捷键
+try:
+    from pynput import keyboard
+except ImportError:
+    keyboard = None
+
+# 翻译结果中需要去除的前缀，合并为一个正则（长前缀优先匹配）
+_REMOVE_PREFIXES = [
+    "以下英文翻译成中文：", "以下中文翻译成英文：",
+    "翻译：", "Translation:", ":", "：",
+    "Translate this English to Chinese:", "Translate this Chinese to English:",
+    "Translate to Chinese:", "Translate to English:",
+    "中文翻译：", "英文翻译：",
+    "Here is the translation:", "The translation is:",
+    "好的，", "Okay,", "嗯，", "Certainly,"
+]
+_CLEAN_RE = re.compile(
+    r"^(?:" + "|".join(re.escape(p) for p in sorted(_REMOVE_PREFIXES, key=len, reverse=True)) + r")\s*",
+    re.IGNORECASE
+)
+
+# 可选：Numba JIT编译音频内循环
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _rms_volume(samples):
+        """计算一帧int16音频的RMS音量（JIT编译为紧凑循环）"""
+        energy = 0.0
+        for i in range(samples.shape[0]):
+            x = float(samples[i])
+            energy += x * x
+        return np.sqrt(energy / max(samples.shape[0], 1))
+else:
+    _rms_volume = None
 
 
 class WhisperSpeechRecognizer(QThread):
@@ -26,10 +65,9 @@ class WhisperSpeechRecognizer(QThread):
     status_updated = pyqtSignal(str)  # 状态更新
     volume_updated = pyqtSignal(int)  # 音量更新
 
-    def __init__(self, device_index=1, model_size="base"):
+    def __init__(self, engine, device_index=1):
         super().__init__()
         self.device_index = device_index
-        self.model_size = model_size
         self._is_running = True
 
         # 音频参数 - 调整参数提高灵敏度
@@ -37,41 +75,111 @@ class WhisperSpeechRecognizer(QThread):
         self.sample_format = pyaudio.paInt16
         self.channels = 1
         self.sample_rate = 16000
-        self.silence_threshold = 100  # 降低阈值，更容易触发
+        self.silence_threshold = 120  # RMS音量阈值，约为原平均绝对值阈值100的1.2倍（RMS通常比平均绝对值高10%~25%）
 
         # 录音参数 - 调整断句逻辑
-        self.audio_buffer = []
         self.silence_frames = 0
         self.is_speaking = False
         self.silence_duration_threshold = 1.2  # 1.2秒静音断句
         self.min_speech_duration = 0.5  # 降低最小时长
         self.max_speech_duration = 8.0
 
+        # 非语音预过滤 - 有声部分（不含末尾断句静音）音量过低或过零率过低（低频嗡嗡声）时跳过Whisper
+        self.min_segment_rms = self.silence_threshold
+        self.min_zero_crossing_rate = 0.02
+
+        # 预分配音频缓冲区（int16字节），避免每帧分配内存
+        self.frame_bytes = self.chunk_size * 2
+        max_bytes = int(self.max_speech_duration * self.sample_rate) * 2 + self.frame_bytes
+        self.audio_buffer = bytearray(max_bytes)
+        self.audio_samples = np.frombuffer(self.audio_buffer, dtype=np.int16)  # 同一内存的int16视图
+        self.audio_write = 0
+
+        # 断句阈值预先换算为帧数，循环中只做整数比较
+        self._sec_per_chunk = self.chunk_size / self.sample_rate
+        self._min_speech_chunks = self._duration_to_chunks(self.min_speech_duration)
+        self._max_speech_chunks = self._duration_to_chunks(self.max_speech_duration)
+        self._silence_end_chunks = self._duration_to_chunks(self.silence_duration_threshold)
+        self._short_sentence_chunks = self._duration_to_chunks(1.0)
+        self._short_silence_chunks = self._duration_to_chunks(0.8)
+        self._keep_bytes = int(0.3 * self.sample_rate / self.chunk_size) * self.frame_bytes
+
+        # 音量计算的预分配暂存区（float32，供BLAS点积使用）
+        self.volume_scratch = np.empty(self.chunk_size, dtype=np.float32)
+        if _rms_volume is not None:
+            # 预热JIT，避免第一帧音频触发编译
+            _rms_volume(np.zeros(self.chunk_size, dtype=np.int16))
+
         # 调试计数器
         self.debug_counter = 0
 
-        # Whisper模型
-        print(f"🔄 加载Whisper模型: {model_size}")
-        self.model = whisper.load_model(model_size)
-        print("✅ Whisper模型加载完成")
+        # Whisper模型（由窗口预加载，跨多次开始/停止复用）
+        self.engine = engine
+
+        # 音频环形缓冲区（单生产者/单消费者）：音频回调写入，识别线程读取
+        # 只有回调修改写指针、只有识别线程修改读指针，因此无需加锁
+        self.ring_slots = 64
+        self.audio_ring = np.zeros((self.ring_slots, self.chunk_size), dtype=np.int16)
+        self.ring_lengths = np.zeros(self.ring_slots, dtype=np.int64)
+        self.ring_write = 0
+        self.ring_read = 0
+        self.ring_event = threading.Event()
 
-        # 音频队列
-        self.audio_queue = queue.Queue()
+        # 待识别语音段队列 - 由独立线程执行Whisper推理，避免阻塞音频处理
+        self.speech_queue = queue.Queue()
+        self.inference_thread = None
 
     def audio_callback(self, in_data, frame_count, time_info, status):
         """音频输入回调"""
         if self._is_running:
-            self.audio_queue.put(in_data)
+            write = self.ring_write
+            # 环形缓冲区已满时丢弃该帧，保证回调不阻塞、不分配内存
+            if write - self.ring_read < self.ring_slots:
+                slot = write % self.ring_slots
+                samples = np.frombuffer(in_data, dtype=np.int16)[:self.chunk_size]
+                self.audio_ring[slot, :len(samples)] = samples
+                self.ring_lengths[slot] = len(samples)
+                self.ring_write = write + 1
+                self.ring_event.set()
         return (in_data, pyaudio.paContinue)
 
+    def _read_frame(self, timeout):
+        """从环形缓冲区取出下一帧（视图），超时无数据时返回None"""
+        if self.ring_read == self.ring_write:
+            self.ring_event.clear()
+            # 清除事件后再检查一次，避免错过回调刚写入的数据
+            if self.ring_read == self.ring_write and not self.ring_event.wait(timeout):
+                return None
+            if self.ring_read == self.ring_write:
+                return None
+
+        # 该槽位要等回调领先满一圈才会被覆盖，此前足够处理完这一帧
+        slot = self.ring_read % self.ring_slots
+        frame = self.audio_ring[slot, :self.ring_lengths[slot]]
+        self.ring_read += 1
+        return frame
+
     def run(self):
         """主识别循环"""
         print("🎤 Whisper语音识别启动 - 自动语言检测")
         self.status_updated.emit("状态: Whisper识别启动")
 
+        # 模型通常已在后台预加载完成；若仍在加载则在此线程等待
+        if not self.engine.is_loaded():
+            self.status_updated.emit("状态: 🔄 加载Whisper模型...")
+        try:
+            self.engine.load()
+        except Exception as e:
+            print(f"❌ Whisper模型加载失败: {e}")
+            self.status_updated.emit(f"状态: 模型错误 - {str(e)}")
+            return
+
         if not self._setup_audio_stream():
             return
 
+        self.inference_thread = threading.Thread(target=self._inference_loop, daemon=True)
+        self.inference_thread.start()
+
         self.status_updated.emit("状态: 🎤 监听中...")
         print("🔊 开始音频处理循环...")
         self._process_audio_stream()
@@ -109,19 +217,14 @@ class WhisperSpeechRecognizer(QThread):
         while self._is_running:
             try:
                 # 获取音频数据
-                data = self.audio_queue.get(timeout=0.1)
-                if not data:
+                audio_data = self._read_frame(timeout=0.1)
+                if audio_data is None:
+                    self._flush_on_timeout()
+                    continue
+                if len(audio_data) == 0:
                     continue
 
-                audio_data = np.frombuffer(data, dtype=np.int16)
-
-                # 计算音量
-                if len(audio_data) > 0:
-                    volume = np.mean(np.abs(audio_data))
-                    if np.isnan(volume) or np.isinf(volume):
-                        volume = 0
-                else:
-                    volume = 0
+                volume = self._chunk_volume(audio_data)
 
                 self.volume_updated.emit(int(volume))
 
@@ -129,7 +232,7 @@ class WhisperSpeechRecognizer(QThread):
                 self.debug_counter += 1
                 if self.debug_counter % 50 == 0:
                     speaking_status = "说话中" if self.is_speaking else "静音"
-                    print(f"📊 音量: {volume:.1f}, 状态: {speaking_status}, 缓冲区: {len(self.audio_buffer)}帧")
+                    print(f"📊 音量: {volume:.1f}, 状态: {speaking_status}, 缓冲区: {self.audio_write // self.frame_bytes}帧")
 
                 # 语音活动检测
                 if volume > self.silence_threshold:
@@ -137,116 +240,152 @@ class WhisperSpeechRecognizer(QThread):
                     if not self.is_speaking:
                         # 开始说话
                         self.is_speaking = True
-                        self.audio_buffer = [data]
+                        self.audio_write = 0
+                        self._append_audio(audio_data)
                         print(f"🎤 检测到语音开始！音量: {volume:.1f}")
                         self.status_updated.emit("状态: 🎤 检测到语音")
                     else:
                         # 持续说话
-                        self.audio_buffer.append(data)
+                        self._append_audio(audio_data)
                 else:
                     # 静音
                     self.silence_frames += 1
                     if self.is_speaking:
-                        self.audio_buffer.append(data)  # 静音帧也收集
+                        self._append_audio(audio_data)  # 静音帧也收集
 
-                # 计算音频时长
-                if self.audio_buffer:
-                    audio_duration = len(self.audio_buffer) * self.chunk_size / self.sample_rate
-                else:
-                    audio_duration = 0
+                # 已缓冲的音频帧数
+                speech_chunks = self.audio_write // self.frame_bytes
 
                 # 断句条件
                 should_process = False
                 reason = ""
 
                 if self.is_speaking:
-                    silence_duration = self.silence_frames * self.chunk_size / self.sample_rate
-
                     # 条件1: 静音断句
-                    if (silence_duration >= self.silence_duration_threshold and
-                            audio_duration >= self.min_speech_duration):
+                    if (self.silence_frames >= self._silence_end_chunks and
+                            speech_chunks >= self._min_speech_chunks):
                         should_process = True
-                        reason = f"静音断句 ({silence_duration:.1f}秒静音)"
+                        reason = f"静音断句 ({self.silence_frames * self._sec_per_chunk:.1f}秒静音)"
 
                     # 条件2: 超长断句
-                    elif audio_duration >= self.max_speech_duration:
+                    elif speech_chunks >= self._max_speech_chunks:
                         should_process = True
-                        reason = f"超长断句 ({audio_duration:.1f}秒)"
+                        reason = f"超长断句 ({speech_chunks * self._sec_per_chunk:.1f}秒)"
 
                     # 条件3: 短句快速处理
-                    elif (audio_duration >= 1.0 and
-                          silence_duration >= 0.8 and
+                    elif (speech_chunks >= self._short_sentence_chunks and
+                          self.silence_frames >= self._short_silence_chunks and
                           volume < self.silence_threshold * 0.7):
                         should_process = True
-                        reason = f"短句断句 ({audio_duration:.1f}秒)"
+                        reason = f"短句断句 ({speech_chunks * self._sec_per_chunk:.1f}秒)"
 
                 # 处理语音段
-                if should_process and self.audio_buffer:
-                    print(f"🎯 {reason}, 音频时长: {audio_duration:.1f}秒")
-                    audio_data = b''.join(self.audio_buffer)
-                    self._process_speech(audio_data)
-
-                    # 重置状态，保留少量上下文
-                    keep_frames = int(0.3 * self.sample_rate / self.chunk_size)
-                    if len(self.audio_buffer) > keep_frames:
-                        self.audio_buffer = self.audio_buffer[-keep_frames:]
+                if should_process and self.audio_write:
+                    print(f"🎯 {reason}, 音频时长: {speech_chunks * self._sec_per_chunk:.1f}秒")
+                    self._queue_segment()
+
+                    # 重置状态，保留少量上下文（将末尾移到缓冲区开头）
+                    keep_bytes = self._keep_bytes
+                    if self.audio_write > keep_bytes:
+                        view = memoryview(self.audio_buffer)
+                        view[:keep_bytes] = view[self.audio_write - keep_bytes:self.audio_write]
+                        self.audio_write = keep_bytes
                     else:
-                        self.audio_buffer = []
+                        self.audio_write = 0
 
                     self.is_speaking = False
                     self.silence_frames = 0
                     print("🔄 重置语音检测状态")
 
-            except queue.Empty:
-                # 处理静音超时
-                if self.is_speaking and self.audio_buffer:
-                    audio_duration = len(self.audio_buffer) * self.chunk_size / self.sample_rate
-                    if audio_duration >= self.min_speech_duration:
-                        print(f"⏰ 队列超时，处理音频: {audio_duration:.1f}秒")
-                        audio_data = b''.join(self.audio_buffer)
-                        self._process_speech(audio_data)
-                        self.audio_buffer = []
-                        self.is_speaking = False
-                continue
-
             except Exception as e:
                 print(f"音频处理错误: {e}")
                 continue
 
         self._cleanup()
 
-    def _process_speech(self, audio_data):
+    def _flush_on_timeout(self):
+        """处理静音超时：一段时间没有音频数据时，把已缓冲的语音送去识别"""
+        if self.is_speaking and self.audio_write:
+            speech_chunks = self.audio_write // self.frame_bytes
+            if speech_chunks >= self._min_speech_chunks:
+                print(f"⏰ 音频超时，处理音频: {speech_chunks * self._sec_per_chunk:.1f}秒")
+                self._queue_segment()
+                self.audio_write = 0
+                self.is_speaking = False
+
+    def _inference_loop(self):
+        """识别线程：取出完整语音段并调用Whisper"""
+        while True:
+            item = self.speech_queue.get()
+            if item is None:
+                break
+            if self._is_running:
+                self._process_speech(*item)
+
+    def _duration_to_chunks(self, seconds):
+        """将时长换算为音频帧数（向上取整，与按秒比较 >= 的结果一致）"""
+        return math.ceil(seconds * self.sample_rate / self.chunk_size)
+
+    def _chunk_volume(self, audio_data):
+        """计算一帧音频的RMS音量"""
+        if _rms_volume is not None:
+            return float(_rms_volume(audio_data))
+
+        # 未安装Numba：点积求能量，单次BLAS调用
+        scratch = self.volume_scratch[:len(audio_data)]
+        np.copyto(scratch, audio_data)
+        return (float(np.dot(scratch, scratch)) / len(scratch)) ** 0.5
+
+    def _append_audio(self, frame):
+        """将一帧int16音频写入预分配缓冲区，缓冲区已满时丢弃"""
+        start = self.audio_write // 2
+        end = start + len(frame)
+        if end > len(self.audio_samples):
+            return
+        self.audio_samples[start:end] = frame
+        self.audio_write = end * 2
+
+    def _buffered_audio(self):
+        """取出当前缓冲的音频数据"""
+        return bytes(memoryview(self.audio_buffer)[:self.audio_write])
+
+    def _queue_segment(self):
+        """将当前语音段送入识别队列，附带去掉末尾静音后的有声部分长度（采样数）"""
+        voiced_bytes = self.audio_write - self.silence_frames * self.frame_bytes
+        voiced_samples = max(voiced_bytes, self.frame_bytes) // 2
+        self.speech_queue.put((self._buffered_audio(), voiced_samples))
+
+    def _is_non_speech(self, samples, audio_np):
+        """粗略判断有声部分是否为非语音（背景噪声/电流声）"""
+        if len(samples) < 2:
+            return True
+
+        # 复用已归一化的float32数组，点积求能量，换算回int16幅度
+        rms = (float(np.dot(audio_np, audio_np)) / len(audio_np)) ** 0.5 * 32768.0
+        signs = np.signbit(samples)
+        zcr = np.count_nonzero(signs[1:] != signs[:-1]) / (len(samples) - 1)
+        if rms < self.min_segment_rms or zcr < self.min_zero_crossing_rate:
+            print(f"🔇 跳过非语音片段 (RMS: {rms:.1f}, 过零率: {zcr:.3f})")
+            return True
+        return False
+
+    def _process_speech(self, audio_data, voiced_samples):
         """处理语音识别"""
         try:
-            # 保存临时音频文件
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_path = temp_file.name
+            # 转换为归一化float32数组（一次分配，原地缩放），供预过滤和Whisper共用
+            samples = np.frombuffer(audio_data, dtype=np.int16)
+            audio_np = samples.astype(np.float32)
+            audio_np *= 1.0 / 32768.0
 
-            # 保存为WAV文件
-            with wave.open(temp_path, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(2)
-                wf.setframerate(self.sample_rate)
-                wf.writeframes(audio_data)
+            # 只对有声部分做预过滤，断句留下的末尾静音会拉低整段音量
+            if self._is_non_speech(samples[:voiced_samples], audio_np[:voiced_samples]):
+                self.status_updated.emit("状态: 🎤 监听中...")
+                return
 
             print("🔍 Whisper识别中...")
             self.status_updated.emit("状态: 🔍 识别中...")
 
-            # 使用Whisper识别（自动检测语言）
-            result = self.model.transcribe(
-                temp_path,
-                fp16=False,  # 使用FP32提高精度
-                language=None  # 自动检测语言
-            )
-
-            text = result["text"].strip()
-            detected_language = result.get("language", "unknown")
-
-            # 清理临时文件
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+            text, detected_language = self.engine.transcribe(audio_np)
 
             if text and len(text) > 1:
                 language_name = self._get_language_name(detected_language)
@@ -281,6 +420,9 @@ class WhisperSpeechRecognizer(QThread):
 
     def _cleanup(self):
         """清理资源"""
+        if self.inference_thread:
+            self.speech_queue.put(None)
+            self.inference_thread.join(timeout=2.0)
         if hasattr(self, 'stream') and self.stream:
             try:
                 self.stream.stop_stream()
@@ -298,21 +440,64 @@ class WhisperSpeechRecognizer(QThread):
 class TranslationWorker(QThread):
     """翻译工作线程"""
     translation_finished = pyqtSignal(str, str, str)  # original, translation, source_lang
+    translation_progress = pyqtSignal(str, str, str)  # original, partial translation, source_lang
     translation_failed = pyqtSignal(str, str)  # original, error
 
-    def __init__(self, model_name="qwen2.5:3b"):
-        super().__init__()
+    def __init__(self, model_name="qwen2.5:3b", parent=None):
+        super().__init__(parent)
         self.model_name = model_name
         self.ollama_url = "http://localhost:11434/api/generate"
         self.request_queue = queue.Queue()
         self._is_running = True
+        self.progress_min_chars = 10  # 流式输出每增加N个字符刷新一次
+
+        # 最近翻译结果的LRU缓存，重复语句无需再请求Ollama
+        self._cache = OrderedDict()
+        self._cache_max = 256
+        self._cache_lock = threading.Lock()
+
+        # 复用HTTP连接（keep-alive），避免每次翻译重新建立TCP连接
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+
+        # 请求体中不变的字段只构建一次
+        self.payload = {
+            "model": self.model_name,
+            "prompt": "",
+            "stream": True
+        }
 
     def add_translation_task(self, text, source_language):
         """添加翻译任务"""
         if text and text.strip():
+            key = self._cache_key(text, source_language)
+            with self._cache_lock:
+                translation = self._cache.get(key)
+                if translation is not None:
+                    self._cache.move_to_end(key)
+
+            if translation is not None:
+                print(f"⚡ 命中翻译缓存: [{source_language}] {text}")
+                self.translation_finished.emit(text, translation, source_language)
+                return
+
             self.request_queue.put((text, source_language))
             print(f"📨 添加翻译任务: [{source_language}] {text}")
 
+    def _cache_key(self, text, source_language):
+        """翻译缓存键"""
+        return source_language, text.strip().lower()
+
+    def _cache_translation(self, text, source_language, translation):
+        """写入翻译缓存，超出容量时淘汰最久未使用的条目"""
+        key = self._cache_key(text, source_language)
+        with self._cache_lock:
+            self._cache[key] = translation
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+
     def run(self):
         """翻译处理循环"""
         print("🌐 翻译线程启动")
@@ -327,6 +512,8 @@ class TranslationWorker(QThread):
             except Exception as e:
                 print(f"翻译线程错误: {e}")
 
+        self._cleanup()
+
     def _process_translation(self, text, source_language):
         """处理单个翻译任务"""
         print(f"🔄 开始翻译: [{source_language}] {text}")
@@ -338,28 +525,38 @@ class TranslationWorker(QThread):
             else:  # 其他语言（主要是英文）-> 中文
                 prompt = f"Translate this to Chinese: {text}"
 
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": False
-            }
+            self.payload["prompt"] = prompt
 
-            # 发送翻译请求
+            # 发送翻译请求（流式接收，边生成边显示）
             start_time = time.time()
-            response = requests.post(self.ollama_url, json=payload, timeout=30)
+            with self.session.post(self.ollama_url, json=self.payload, stream=True, timeout=30) as response:
+                if response.status_code != 200:
+                    error_msg = f"HTTP错误: {response.status_code}"
+                    print(f"❌ {error_msg}")
+                    self.translation_failed.emit(text, error_msg)
+                    return
+
+                translation = ""
+                emitted_length = 0
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    translation += chunk.get("response", "")
+
+                    if len(translation) - emitted_length >= self.progress_min_chars:
+                        emitted_length = len(translation)
+                        partial = self._clean_translation(translation.strip())
+                        self.translation_progress.emit(text, partial, source_language)
+                # 不在done处提前退出：读完分块结束标记，连接才能归还连接池复用
+
             response_time = (time.time() - start_time) * 1000
+            translation = self._clean_translation(translation.strip())
 
-            if response.status_code == 200:
-                result = response.json()
-                translation = result.get("response", "").strip()
-                translation = self._clean_translation(translation)
-
-                print(f"✅ 翻译完成 ({response_time:.0f}ms): {translation}")
-                self.translation_finished.emit(text, translation, source_language)
-            else:
-                error_msg = f"HTTP错误: {response.status_code}"
-                print(f"❌ {error_msg}")
-                self.translation_failed.emit(text, error_msg)
+            print(f"✅ 翻译完成 ({response_time:.0f}ms): {translation}")
+            if translation:
+                self._cache_translation(text, source_language, translation)
+            self.translation_finished.emit(text, translation, source_language)
 
         except requests.exceptions.Timeout:
             error_msg = "翻译超时"
@@ -376,20 +573,14 @@ class TranslationWorker(QThread):
 
     def _clean_translation(self, translation):
         """清理翻译结果"""
-        remove_prefixes = [
-            "以下英文翻译成中文：", "以下中文翻译成英文：",
-            "翻译：", "Translation:", ":", "：",
-            "Translate this English to Chinese:", "Translate this Chinese to English:",
-            "Translate to Chinese:", "Translate to English:",
-            "中文翻译：", "英文翻译：",
-            "Here is the translation:", "The translation is:",
-            "好的，", "Okay,", "嗯，", "Certainly,"
-        ]
+        translation = translation.strip()
 
-        # 移除前缀
-        for prefix in remove_prefixes:
-            if translation.startswith(prefix):
-                translation = translation[len(prefix):].strip()
+        # 移除前缀（可能叠加多个，如 "翻译：Translation:"）
+        while True:
+            cleaned = _CLEAN_RE.sub("", translation, count=1)
+            if cleaned == translation:
+                break
+            translation = cleaned
 
         return translation.strip()
 
@@ -397,8 +588,75 @@ class TranslationWorker(QThread):
         """停止翻译线程"""
         self._is_running = False
 
+    def _cleanup(self):
+        """清理资源"""
+        try:
+            self.session.close()
+        except:
+            pass
+        print("🛑 翻译线程退出")
+
+
+class ColorSettingsDialog(QDialog):
+    """颜色设置对话框 - 三种颜色在同一个对话框中选择，确定后一次性应用"""
+
+    def __init__(self, bg_rgb, original_rgb, translation_rgb, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("颜色设置")
+        self.setFixedSize(300, 180)
+        self.colors = {
+            "bg": QColor(*bg_rgb),
+            "original": QColor(*original_rgb),
+            "translation": QColor(*translation_rgb)
+        }
+        layout = QVBoxLayout()
+
+        for key, title in (("bg", "背景颜色"), ("original", "原文颜色"), ("translation", "翻译颜色")):
+            row = QHBoxLayout()
+            row.addWidget(QLabel(title))
+            row.addStretch()
+            swatch = QPushButton()
+            swatch.setFixedSize(60, 24)
+            swatch.clicked.connect(lambda checked, k=key, t=title, b=swatch: self._pick_color(k, t, b))
+            self._update_swatch(swatch, self.colors[key])
+            row.addWidget(swatch)
+            layout.addLayout(row)
+
+        btn_layout = QHBoxLayout()
+        ok_btn = QPushButton("确定")
+        ok_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("取消")
+        cancel_btn.clicked.connect(self.reject)
+        btn_layout.addWidget(ok_btn)
+        btn_layout.addWidget(cancel_btn)
+
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+    def _pick_color(self, key, title, swatch):
+        """选择单个颜色并更新色块"""
+        color = QColorDialog.getColor(self.colors[key], self, f"选择{title}")
+        if color.isValid() and color.rgb() != self.colors[key].rgb():
+            self.colors[key] = color
+            self._update_swatch(swatch, color)
+
+    def _update_swatch(self, swatch, color):
+        """更新色块显示"""
+        swatch.setStyleSheet(
+            f"background-color: rgb({color.red()}, {color.green()}, {color.blue()}); border: 1px solid #888;")
+
 
 class DraggableSubtitleWindow(QMainWindow):
+    hotkey_pressed = pyqtSignal(object)  # 键盘监听线程 -> GUI线程
+
+    # 透明度菜单选项（百分比）及其显示文本
+    _OPACITY_LEVELS = (100, 80, 60, 40, 20)
+    _OPACITY_LABELS = tuple(f"{o}%" for o in _OPACITY_LEVELS)
+
+    # 样式表模板，渲染结果与上次相同时不重新设置
+    _TEXT_QSS_TEMPLATE = "color: rgba({rgba}); background-color: transparent;"
+    _BACKGROUND_QSS_TEMPLATE = "background-color: rgba({rgba}); border-radius: 10px;"
+
     def __init__(self):
         super().__init__()
         # 初始化变量
@@ -408,6 +666,8 @@ class DraggableSubtitleWindow(QMainWindow):
         self.hide_ui = False
         self.text_opacity = 255
         self.background_opacity = 180
+        self.text_opacity_pct = 100  # 百分比，与上面的alpha值对应
+        self.background_opacity_pct = 70
         self.whisper_model_size = "base"  # base, small, medium
 
         # 模型列表
@@ -416,6 +676,9 @@ class DraggableSubtitleWindow(QMainWindow):
         # 工作线程
         self.speech_recognizer = None
         self.translation_worker = None
+        self.whisper_engine = None
+        self._stopping_workers = []  # 已请求退出、尚未结束的翻译线程
+        self._closing = False
 
         # 字幕数据
         self.previous_subtitle = {"original": "", "translation": "", "language": ""}
@@ -423,27 +686,82 @@ class DraggableSubtitleWindow(QMainWindow):
 
         # UI设置
         self.font_size = 18
-        self.bg_color = QColor(0, 0, 0, self.background_opacity)
-        self.original_color = QColor(255, 255, 0, self.text_opacity)
-        self.translation_color = QColor(0, 255, 255, self.text_opacity)
+        # 颜色只保存不可变的RGB，透明度单独保存；rgba字符串在变化时计算一次
+        self._bg_rgb = (0, 0, 0)
+        self._original_rgb = (255, 255, 0)
+        self._translation_rgb = (0, 255, 255)
+        self._update_bg_rgba()
+        self._update_text_rgba()
+
+        # 已应用的样式表缓存，样式未变化时不重复调用setStyleSheet
+        self._original_style = None
+        self._translation_style = None
+        self._background_style = None
+
+        # 待刷新的标签文本，由定时器合并后统一刷新（约30Hz）
+        self._pending_text = {}
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(33)
+        self._flush_timer.timeout.connect(self._flush_ui)
+
+        # 拖动窗口时合并移动事件，按屏幕刷新率（约60Hz）移动一次
+        self._pending_move_pos = None
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.setInterval(16)
+        self._move_timer.timeout.connect(self._apply_pending_move)
 
         # 初始化UI
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
         self.init_ui()
+        self._build_context_menu()
         self.setup_keyboard_listener()
 
         # 启动翻译线程
         self._start_translation_worker()
 
+        # 后台预加载Whisper模型
+        self._preload_whisper()
+
     def _start_translation_worker(self):
         """启动翻译工作线程"""
-        self.translation_worker = TranslationWorker(self.model_name)
+        self.translation_worker = TranslationWorker(self.model_name, self)
         self.translation_worker.translation_finished.connect(self.on_translation_finished)
+        self.translation_worker.translation_progress.connect(self.on_translation_progress)
         self.translation_worker.translation_failed.connect(self.on_translation_failed)
         self.translation_worker.start()
         print("✅ 翻译线程启动")
 
+    def _stop_translation_worker(self):
+        """请求翻译线程退出（不等待），线程结束后由 _on_worker_stopped 释放"""
+        worker = self.translation_worker
+        self.translation_worker = None
+        # 保留引用直到线程真正结束，避免QThread运行中被回收
+        self._stopping_workers.append(worker)
+        worker.finished.connect(lambda: self._on_worker_stopped(worker), Qt.QueuedConnection)
+        worker.stop()
+
+    def _on_worker_stopped(self, worker):
+        """旧翻译线程已结束"""
+        self._stopping_workers.remove(worker)
+
+        # 断开信号并交给Qt释放，避免反复切换模型时QObject不断累积
+        worker.finished.disconnect()
+        worker.translation_finished.disconnect()
+        worker.translation_progress.disconnect()
+        worker.translation_failed.disconnect()
+        worker.deleteLater()
+
+        if self._closing and not self._stopping_workers:
+            QApplication.quit()
+
+    def _preload_whisper(self):
+        """启动Whisper识别进程，模型在子进程中加载并预热，避免首次按F2时界面卡顿"""
+        self.whisper_engine = WhisperProcess(self.whisper_model_size)
+        self.whisper_engine.start()
+
     def init_ui(self):
         """初始化UI界面"""
         self.setWindowTitle("实时双语字幕 - Whisper智能版")
@@ -452,8 +770,7 @@ class DraggableSubtitleWindow(QMainWindow):
         self.setAttribute(Qt.WA_TranslucentBackground)
 
         # 设置样式
-        self.central_widget.setStyleSheet(
-            f"background-color: rgba({self.bg_color.red()}, {self.bg_color.green()}, {self.bg_color.blue()}, {self.background_opacity}); border-radius: 10px;")
+        self.update_background_style()
 
         layout = QVBoxLayout(self.central_widget)
         layout.setSpacing(5)
@@ -568,7 +885,7 @@ class DraggableSubtitleWindow(QMainWindow):
 
         # 更新语言显示
         language_name = self._get_language_name(detected_language)
-        self.language_label.setText(f"检测语言: {language_name}")
+        self._queue_text(self.language_label, f"检测语言: {language_name}")
 
         # 第一步：立即更新界面显示识别的文本
         if self.current_subtitle["original"]:
@@ -592,6 +909,12 @@ class DraggableSubtitleWindow(QMainWindow):
             self.update_display()
             print(f"✅ 翻译结果显示完成: {translated_text}")
 
+    def on_translation_progress(self, original_text, partial_text, source_language):
+        """流式翻译进度回调"""
+        if self.current_subtitle["original"] == original_text:
+            self.current_subtitle["translation"] = partial_text
+            self.update_display()
+
     def on_translation_failed(self, original_text, error_msg):
         """翻译失败回调"""
         if self.current_subtitle["original"] == original_text:
@@ -632,15 +955,15 @@ class DraggableSubtitleWindow(QMainWindow):
         self.start_btn.setText("停止翻译 (F2)")
         self.start_btn.setStyleSheet(
             "QPushButton{background-color: rgba(200, 0, 0, 200); color: white; border: none; padding: 8px 15px; border-radius: 3px;} QPushButton:hover{background-color: rgba(255, 0, 0, 200);}")
-        self.status_label.setText("状态: 启动Whisper识别...")
+        self._queue_text(self.status_label, "状态: 启动Whisper识别...")
 
         # 启动Whisper语音识别线程
         self.speech_recognizer = WhisperSpeechRecognizer(
-            device_index=self.audio_device_index,
-            model_size=self.whisper_model_size
+            self.whisper_engine,
+            device_index=self.audio_device_index
         )
         self.speech_recognizer.text_recognized.connect(self.on_speech_recognized)
-        self.speech_recognizer.status_updated.connect(self.status_label.setText)
+        self.speech_recognizer.status_updated.connect(self.on_status_updated)
         self.speech_recognizer.volume_updated.connect(self.on_volume_updated)
         self.speech_recognizer.start()
 
@@ -652,20 +975,40 @@ class DraggableSubtitleWindow(QMainWindow):
         self.start_btn.setText("开始翻译 (F2)")
         self.start_btn.setStyleSheet(
             "QPushButton{background-color: rgba(0, 100, 0, 200); color: white; border: none; padding: 8px 15px; border-radius: 3px;} QPushButton:hover{background-color: rgba(0, 150, 0, 200);}")
-        self.status_label.setText("状态: 已停止")
-        self.volume_label.setText("音量: 0")
-        self.language_label.setText("")
+        self._queue_text(self.status_label, "状态: 已停止")
+        self._queue_text(self.volume_label, "音量: 0")
+        self._queue_text(self.language_label, "")
 
         # 停止语音识别
         if self.speech_recognizer:
             self.speech_recognizer.stop()
             self.speech_recognizer.wait(3000)
+            # 录音期间切换过Whisper模型，关闭旧的识别进程
+            if self.speech_recognizer.engine is not self.whisper_engine:
+                self.speech_recognizer.engine.stop(timeout=0)
 
         print("🛑 语音识别停止")
 
     def on_volume_updated(self, volume):
         """更新音量显示"""
-        self.volume_label.setText(f"音量: {volume}")
+        self._queue_text(self.volume_label, f"音量: {volume}")
+
+    def on_status_updated(self, status):
+        """更新状态显示"""
+        self._queue_text(self.status_label, status)
+
+    def _queue_text(self, label, text):
+        """登记标签的新文本，等待定时器合并刷新"""
+        self._pending_text[label] = text
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_ui(self):
+        """将最新的文本一次性刷新到界面，只更新发生变化的标签"""
+        pending, self._pending_text = self._pending_text, {}
+        for label, text in pending.items():
+            if label.text() != text:
+                label.setText(text)
 
     def check_ollama_availability(self):
         """检查Ollama服务是否可用"""
@@ -683,10 +1026,10 @@ class DraggableSubtitleWindow(QMainWindow):
 
     def update_display(self):
         """更新界面显示"""
-        self.previous_original_label.setText(self.previous_subtitle["original"])
-        self.previous_translation_label.setText(self.previous_subtitle["translation"])
-        self.current_original_label.setText(self.current_subtitle["original"])
-        self.current_translation_label.setText(self.current_subtitle["translation"])
+        self._queue_text(self.previous_original_label, self.previous_subtitle["original"])
+        self._queue_text(self.previous_translation_label, self.previous_subtitle["translation"])
+        self._queue_text(self.current_original_label, self.current_subtitle["original"])
+        self._queue_text(self.current_translation_label, self.current_subtitle["translation"])
 
     def show_device_dialog(self):
         """显示音频设备设置对话框"""
@@ -738,23 +1081,53 @@ class DraggableSubtitleWindow(QMainWindow):
 
     def set_whisper_model(self, model_size):
         """设置Whisper模型大小"""
+        if model_size == self.whisper_model_size:
+            return
         self.whisper_model_size = model_size
+        # 新模型在后台预加载，下次开始翻译时生效
+        old_engine = self.whisper_engine
+        self._preload_whisper()
+        # 旧进程正被录音使用时，停止录音后再关闭；否则立即关闭
+        in_use = (self.is_recording and self.speech_recognizer and
+                  self.speech_recognizer.engine is old_engine)
+        if not in_use:
+            old_engine.stop(timeout=0)
         print(f"切换Whisper模型: {model_size}")
 
     def update_background_style(self):
         """更新背景样式"""
-        self.central_widget.setStyleSheet(
-            f"background-color: rgba({self.bg_color.red()}, {self.bg_color.green()}, {self.bg_color.blue()}, {self.background_opacity}); border-radius: 10px;")
+        background_style = self._BACKGROUND_QSS_TEMPLATE.format(rgba=self._bg_rgba)
+        if background_style != self._background_style:
+            self._background_style = background_style
+            self.central_widget.setStyleSheet(background_style)
+
+    def _format_rgba(self, rgb, alpha):
+        """生成样式表使用的 "r, g, b, a" 字符串"""
+        return "{}, {}, {}, {}".format(*rgb, alpha)
+
+    def _update_bg_rgba(self):
+        """背景颜色或透明度变化后重新计算rgba字符串"""
+        self._bg_rgba = self._format_rgba(self._bg_rgb, self.background_opacity)
+
+    def _update_text_rgba(self):
+        """文字颜色或透明度变化后重新计算rgba字符串"""
+        self._original_rgba = self._format_rgba(self._original_rgb, self.text_opacity)
+        self._translation_rgba = self._format_rgba(self._translation_rgb, self.text_opacity)
 
     def update_text_style(self):
         """更新文字样式"""
-        original_style = f"color: rgba({self.original_color.red()}, {self.original_color.green()}, {self.original_color.blue()}, {self.text_opacity}); background-color: transparent;"
-        translation_style = f"color: rgba({self.translation_color.red()}, {self.translation_color.green()}, {self.translation_color.blue()}, {self.text_opacity}); background-color: transparent;"
-
-        self.current_original_label.setStyleSheet(original_style)
-        self.previous_original_label.setStyleSheet(original_style)
-        self.current_translation_label.setStyleSheet(translation_style)
-        self.previous_translation_label.setStyleSheet(translation_style)
+        original_style = self._TEXT_QSS_TEMPLATE.format(rgba=self._original_rgba)
+        translation_style = self._TEXT_QSS_TEMPLATE.format(rgba=self._translation_rgba)
+
+        # 仅在样式变化时重设，避免Qt重新解析样式表并重绘
+        if original_style != self._original_style:
+            self._original_style = original_style
+            self.current_original_label.setStyleSheet(original_style)
+            self.previous_original_label.setStyleSheet(original_style)
+        if translation_style != self._translation_style:
+            self._translation_style = translation_style
+            self.current_translation_label.setStyleSheet(translation_style)
+            self.previous_translation_label.setStyleSheet(translation_style)
 
     def apply_fonts(self):
         """应用字体设置"""
@@ -797,15 +1170,16 @@ class DraggableSubtitleWindow(QMainWindow):
 
     def set_background_opacity(self, opacity):
         """设置背景透明度"""
+        self.background_opacity_pct = opacity
         self.background_opacity = int(opacity * 2.55)
-        self.bg_color.setAlpha(self.background_opacity)
+        self._update_bg_rgba()
         self.update_background_style()
 
     def set_text_opacity(self, opacity):
         """设置文字透明度"""
+        self.text_opacity_pct = opacity
         self.text_opacity = int(opacity * 2.55)
-        self.original_color.setAlpha(self.text_opacity)
-        self.translation_color.setAlpha(self.text_opacity)
+        self._update_text_rgba()
         self.update_text_style()
 
     def set_font_size(self, size):
@@ -816,10 +1190,9 @@ class DraggableSubtitleWindow(QMainWindow):
     def set_model(self, model_name):
         """设置AI模型"""
         self.model_name = model_name
-        # 重启翻译线程
+        # 重启翻译线程：旧线程在后台退出（不阻塞界面），新线程立即启动，切换期间的识别结果不会丢失
         if self.translation_worker:
-            self.translation_worker.stop()
-            self.translation_worker.wait(2000)
+            self._stop_translation_worker()
         self._start_translation_worker()
         print(f"切换模型: {model_name}")
 
@@ -850,103 +1223,149 @@ class DraggableSubtitleWindow(QMainWindow):
             print(f"删除模型: {self.model_name}")
 
     def show_color_settings(self):
-        """显示颜色设置对话框"""
-        bg_color = QColorDialog.getColor(self.bg_color, self, "选择背景颜色")
-        if bg_color.isValid():
-            self.bg_color = bg_color
-            self.bg_color.setAlpha(self.background_opacity)
-            self.update_background_style()
+        """显示颜色设置对话框（非阻塞）"""
+        dialog = ColorSettingsDialog(self._bg_rgb, self._original_rgb, self._translation_rgb, self)
+        dialog.finished.connect(lambda result: self._apply_colors(dialog, result))
+        dialog.open()
+
+    def _apply_colors(self, dialog, result):
+        """颜色设置对话框关闭回调 - 确定时一次性应用所有颜色"""
+        dialog.deleteLater()
+        if result != QDialog.Accepted:
+            return
 
-        original_color = QColorDialog.getColor(self.original_color, self, "选择原文颜色")
-        if original_color.isValid():
-            self.original_color = original_color
-            self.original_color.setAlpha(self.text_opacity)
-            self.update_text_style()
+        bg_rgb = dialog.colors["bg"].getRgb()[:3]
+        original_rgb = dialog.colors["original"].getRgb()[:3]
+        translation_rgb = dialog.colors["translation"].getRgb()[:3]
 
-        translation_color = QColorDialog.getColor(self.translation_color, self, "选择翻译颜色")
-        if translation_color.isValid():
-            self.translation_color = translation_color
-            self.translation_color.setAlpha(self.text_opacity)
+        # 只更新实际变化的颜色，未改动时不触发样式表重新解析
+        if bg_rgb != self._bg_rgb:
+            self._bg_rgb = bg_rgb
+            self._update_bg_rgba()
+            self.update_background_style()
+        if original_rgb != self._original_rgb or translation_rgb != self._translation_rgb:
+            self._original_rgb = original_rgb
+            self._translation_rgb = translation_rgb
+            self._update_text_rgba()
             self.update_text_style()
 
-    def contextMenuEvent(self, event):
-        """右键菜单事件"""
-        context_menu = QMenu(self)
+    def _build_context_menu(self):
+        """构建右键菜单（只构建一次，打开时仅刷新勾选状态）"""
+        self._context_menu = QMenu(self)
 
         # Whisper模型选择
-        whisper_menu = context_menu.addMenu("Whisper模型")
+        whisper_menu = self._context_menu.addMenu("Whisper模型")
         model_sizes = [
             ("base (推荐)", "base"),
             ("small (快速)", "small"),
             ("medium (高精度)", "medium")
         ]
 
+        self._whisper_actions = {}
         for name, size in model_sizes:
             action = whisper_menu.addAction(name)
             action.setCheckable(True)
-            action.setChecked(size == self.whisper_model_size)
             action.triggered.connect(lambda checked, s=size: self.set_whisper_model(s))
+            self._whisper_actions[size] = action
+        whisper_menu.aboutToShow.connect(self._refresh_whisper_menu)
 
         # 透明度设置菜单
-        opacity_menu = context_menu.addMenu("背景透明度")
-        current_bg_opacity = int(self.background_opacity / 2.55)  # 转换为百分比
-        for opacity in [100, 80, 60, 40, 20]:
-            action = opacity_menu.addAction(f"{opacity}%")
+        opacity_menu = self._context_menu.addMenu("背景透明度")
+        self._bg_opacity_actions = {}
+        for opacity, label in zip(self._OPACITY_LEVELS, self._OPACITY_LABELS):
+            action = opacity_menu.addAction(label)
             action.setCheckable(True)
-            action.setChecked(opacity == current_bg_opacity)
             action.triggered.connect(lambda checked, o=opacity: self.set_background_opacity(o))
+            self._bg_opacity_actions[opacity] = action
+        opacity_menu.aboutToShow.connect(self._refresh_opacity_menu)
 
-        text_opacity_menu = context_menu.addMenu("文字透明度")
-        current_text_opacity = int(self.text_opacity / 2.55)  # 转换为百分比
-        for opacity in [100, 80, 60, 40, 20]:
-            action = text_opacity_menu.addAction(f"{opacity}%")
+        text_opacity_menu = self._context_menu.addMenu("文字透明度")
+        self._text_opacity_actions = {}
+        for opacity, label in zip(self._OPACITY_LEVELS, self._OPACITY_LABELS):
+            action = text_opacity_menu.addAction(label)
             action.setCheckable(True)
-            action.setChecked(opacity == current_text_opacity)
             action.triggered.connect(lambda checked, o=opacity: self.set_text_opacity(o))
+            self._text_opacity_actions[opacity] = action
+        text_opacity_menu.aboutToShow.connect(self._refresh_text_opacity_menu)
 
-        font_menu = context_menu.addMenu("字体大小")
+        font_menu = self._context_menu.addMenu("字体大小")
         for size in [14, 16, 18, 20, 24]:
             action = font_menu.addAction(f"{size}px")
             action.triggered.connect(lambda checked, s=size: self.set_font_size(s))
 
-        context_menu.addSeparator()
+        self._context_menu.addSeparator()
+
+        # AI模型选择（子菜单打开时才填充，模型列表变化时重建）
+        self._model_menu = self._context_menu.addMenu("AI模型")
+        self._model_actions = {}
+        self._model_menu_snapshot = None
+        self._model_menu.aboutToShow.connect(self._populate_model_menu)
+
+        # 隐藏UI选项
+        self._hide_ui_action = self._context_menu.addAction("隐藏UI控件")
+        self._hide_ui_action.setCheckable(True)
+        self._hide_ui_action.triggered.connect(self.toggle_ui_visibility)
+
+        self._context_menu.addSeparator()
+
+        color_action = self._context_menu.addAction("颜色设置")
+        color_action.triggered.connect(self.show_color_settings)
+
+        self._context_menu.addSeparator()
+
+        exit_action = self._context_menu.addAction("退出")
+        exit_action.triggered.connect(self.close)
 
-        # AI模型选择
-        model_menu = context_menu.addMenu("AI模型")
+    def _rebuild_model_menu(self):
+        """重建AI模型子菜单"""
+        self._model_menu.clear()  # clear() 会删除菜单拥有的旧QAction
+        self._model_actions = {}
 
         # 添加现有模型
         for model in self.custom_models:
-            action = model_menu.addAction(model)
+            action = self._model_menu.addAction(model)
             action.setCheckable(True)
-            action.setChecked(model == self.model_name)
             action.triggered.connect(lambda checked, m=model: self.set_model(m))
+            self._model_actions[model] = action
 
-        model_menu.addSeparator()
+        self._model_menu.addSeparator()
 
         # 添加自定义模型选项
-        add_model_action = model_menu.addAction("➕ 添加自定义模型")
+        add_model_action = self._model_menu.addAction("➕ 添加自定义模型")
         add_model_action.triggered.connect(self.add_custom_model)
 
-        remove_model_action = model_menu.addAction("🗑️ 删除当前模型")
+        remove_model_action = self._model_menu.addAction("🗑️ 删除当前模型")
         remove_model_action.triggered.connect(self.remove_current_model)
 
-        # 隐藏UI选项
-        hide_ui_action = context_menu.addAction("隐藏UI控件")
-        hide_ui_action.setCheckable(True)
-        hide_ui_action.setChecked(self.hide_ui)
-        hide_ui_action.triggered.connect(self.toggle_ui_visibility)
+        self._model_menu_snapshot = tuple(self.custom_models)
 
-        context_menu.addSeparator()
+    def _populate_model_menu(self):
+        """AI模型子菜单打开时填充，并刷新勾选状态"""
+        if self._model_menu_snapshot != tuple(self.custom_models):
+            self._rebuild_model_menu()
+        for model, action in self._model_actions.items():
+            action.setChecked(model == self.model_name)
 
-        color_action = context_menu.addAction("颜色设置")
-        color_action.triggered.connect(self.show_color_settings)
+    def _refresh_whisper_menu(self):
+        """Whisper模型子菜单打开时刷新勾选状态"""
+        for size, action in self._whisper_actions.items():
+            action.setChecked(size == self.whisper_model_size)
 
-        context_menu.addSeparator()
+    def _refresh_opacity_menu(self):
+        """背景透明度子菜单打开时刷新勾选状态"""
+        for opacity, action in self._bg_opacity_actions.items():
+            action.setChecked(opacity == self.background_opacity_pct)
 
-        exit_action = context_menu.addAction("退出")
-        exit_action.triggered.connect(self.close)
+    def _refresh_text_opacity_menu(self):
+        """文字透明度子菜单打开时刷新勾选状态"""
+        for opacity, action in self._text_opacity_actions.items():
+            action.setChecked(opacity == self.text_opacity_pct)
 
-        context_menu.exec_(event.globalPos())
+    def contextMenuEvent(self, event):
+        """右键菜单事件"""
+        self._hide_ui_action.setChecked(self.hide_ui)
+
+        self._context_menu.exec_(event.globalPos())
 
     def mousePressEvent(self, event):
         """鼠标按下事件"""
@@ -957,33 +1376,59 @@ class DraggableSubtitleWindow(QMainWindow):
     def mouseMoveEvent(self, event):
         """鼠标移动事件"""
         if event.buttons() == Qt.LeftButton and hasattr(self, 'drag_start_position'):
-            self.move(event.globalPos() - self.drag_start_position)
+            self._pending_move_pos = event.globalPos() - self.drag_start_position
+            if not self._move_timer.isActive():
+                self._move_timer.start()
             event.accept()
 
+    def _apply_pending_move(self):
+        """应用最近一次拖动的目标位置"""
+        if self._pending_move_pos is not None:
+            self.move(self._pending_move_pos)
+            self._pending_move_pos = None
+
     def setup_keyboard_listener(self):
         """设置键盘监听"""
+        if keyboard is None:
+            # 无pynput：使用Qt快捷键，不需要额外的监听线程（仅在程序有焦点时生效）
+            QShortcut(QKeySequence(Qt.Key_F2), self, activated=self.toggle_recording,
+                      context=Qt.ApplicationShortcut)
+            QShortcut(QKeySequence(Qt.Key_Escape), self, activated=self.close,
+                      context=Qt.ApplicationShortcut)
+            return
+
+        # 快捷键分发表：每次按键只做一次字典查找
+        self._key_dispatch = {
+            keyboard.Key.f2: self.toggle_recording,
+            keyboard.Key.esc: self.close
+        }
+        # 监听回调运行在pynput线程，通过信号转到GUI线程执行
+        self.hotkey_pressed.connect(self._run_hotkey)
 
         def on_press(key):
-            try:
-                if key == keyboard.Key.f2:
-                    self.toggle_recording()
-                elif key == keyboard.Key.esc:
-                    self.close()
-            except:
-                pass
+            handler = self._key_dispatch.get(key)
+            if handler is not None:
+                self.hotkey_pressed.emit(handler)
 
         self.keyboard_listener = keyboard.Listener(on_press=on_press)
         self.keyboard_listener.daemon = True
         self.keyboard_listener.start()
 
+    def _run_hotkey(self, handler):
+        """在GUI线程执行快捷键操作"""
+        handler()
+
     def closeEvent(self, event):
         """程序关闭事件"""
         self.stop_recording()
+        self.whisper_engine.stop()
 
-        # 停止翻译线程
+        # 停止翻译线程（不等待），全部退出后再结束程序
+        self._closing = True
         if self.translation_worker:
-            self.translation_worker.stop()
-            self.translation_worker.wait(3000)
+            self._stop_translation_worker()
+        if self._stopping_workers:
+            QApplication.instance().setQuitOnLastWindowClosed(False)
 
         if hasattr(self, 'keyboard_listener'):
             self.keyboard_listener.stop()
@@ -0,0 +1,207 @@
+import os
+import threading
+import numpy as np
+
+# Whisper后端 - 优先使用faster-whisper (CTranslate2)，未安装时回退到openai-whisper
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+try:
+    import whisper
+except ImportError:
+    whisper = None
+
+# 可选：whisper.cpp (ggml量化模型) - CPU上更快，设置 USE_WHISPERCPP=1 强制使用
+try:
+    from pywhispercpp.model import Model as WhisperCppModel
+except ImportError:
+    WhisperCppModel = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+
+def _cuda_available():
+    """检测CUDA是否可用"""
+    if torch is not None:
+        return torch.cuda.is_available()
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+if torch is not None:
+    class CudaGraphEncoder(torch.nn.Module):
+        """以CUDA Graph回放的Whisper编码器 - 输入固定为30秒的log-mel"""
+
+        def __init__(self, encoder, n_mels, dtype):
+            super().__init__()
+            self.encoder = encoder
+            self.mel_buf = torch.zeros((1, n_mels, whisper.audio.N_FRAMES), device="cuda", dtype=dtype)
+
+            # 先在独立流上预热，再捕获计算图
+            warmup_stream = torch.cuda.Stream()
+            warmup_stream.wait_stream(torch.cuda.current_stream())
+            with torch.no_grad(), torch.cuda.stream(warmup_stream):
+                for _ in range(3):
+                    self.encoder(self.mel_buf)
+            torch.cuda.current_stream().wait_stream(warmup_stream)
+
+            self.graph = torch.cuda.CUDAGraph()
+            with torch.no_grad(), torch.cuda.graph(self.graph):
+                self.enc_out = self.encoder(self.mel_buf)
+
+        def forward(self, mel):
+            # 形状或类型不匹配时回退到普通前向
+            if (mel.shape != self.mel_buf.shape or mel.dtype != self.mel_buf.dtype
+                    or mel.device != self.mel_buf.device):
+                return self.encoder(mel)
+
+            self.mel_buf.copy_(mel, non_blocking=True)
+            self.graph.replay()
+            # 下次回放会覆盖输出缓冲区，返回副本
+            return self.enc_out.clone()
+
+
+class WhisperEngine:
+    """Whisper模型封装 - 负责加载、预热和识别，可在多次录音之间复用"""
+
+    sample_rate = 16000
+
+    # whisper.cpp 各尺寸发布的量化模型名（medium没有q5_1，只有q5_0/q8_0）
+    _WHISPER_CPP_MODELS = {"base": "base-q5_1", "small": "small-q5_1", "medium": "medium-q5_0"}
+
+    def __init__(self, model_size="base"):
+        self.model_size = model_size
+        self.model = None
+        self.backend = None
+        self.use_cuda = False
+        self.fp16 = False
+        self._lock = threading.Lock()
+
+    def is_loaded(self):
+        """模型是否已加载"""
+        return self.model is not None
+
+    def load(self):
+        """加载并预热模型（线程安全，重复调用直接返回）"""
+        with self._lock:
+            if self.model is not None:
+                return
+
+            print(f"🔄 加载Whisper模型: {self.model_size}")
+            self.use_cuda = _cuda_available()
+            self.fp16 = self.use_cuda  # GPU上使用FP16推理，CPU上FP16不受支持
+            if self._use_whisper_cpp():
+                # whisper.cpp: 5位量化权重 + AVX/NEON矩阵内核
+                self.backend = "whisper.cpp"
+                model = WhisperCppModel(
+                    self._WHISPER_CPP_MODELS.get(self.model_size, self.model_size),
+                    n_threads=max(1, (os.cpu_count() or 2) // 2)
+                )
+            elif WhisperModel is not None:
+                # faster-whisper: GPU使用int8_float16，CPU使用int8量化
+                self.backend = "faster-whisper"
+                model = WhisperModel(
+                    self.model_size,
+                    device="cuda" if self.use_cuda else "cpu",
+                    compute_type="int8_float16" if self.use_cuda else "int8"
+                )
+            else:
+                self.backend = "openai-whisper"
+                model = whisper.load_model(self.model_size)
+                self._compile_model(model)
+                self._capture_encoder_graph(model)
+
+            # 预热：首次推理较慢，提前完成，第一句话即可快速识别
+            self._transcribe(model, np.zeros(self.sample_rate, dtype=np.float32))
+            self.model = model
+            print(f"✅ Whisper模型加载完成 ({self.backend})")
+
+    def _use_whisper_cpp(self):
+        """是否使用whisper.cpp后端：显式启用，或无GPU且未安装faster-whisper"""
+        if WhisperCppModel is None:
+            return False
+        if os.environ.get("USE_WHISPERCPP") == "1":
+            return True
+        return not self.use_cuda and WhisperModel is None
+
+    def _compile_model(self, model):
+        """使用torch.compile编译编码器和解码器，减少逐算子调度开销"""
+        if torch is None or not hasattr(torch, "compile"):
+            return
+
+        encoder, decoder = model.encoder, model.decoder
+        try:
+            model.encoder = torch.compile(encoder, mode="reduce-overhead")
+            model.decoder = torch.compile(decoder, mode="reduce-overhead")
+            # 预热：首次调用会触发编译，避免第一句话时卡顿
+            model.transcribe(np.zeros(self.sample_rate, dtype=np.float32), fp16=self.fp16)
+            print("✅ torch.compile 编译完成")
+        except Exception as e:
+            # 旧版PyTorch或编译失败时回退到普通模式
+            print(f"⚠️ torch.compile 不可用，使用普通模式: {e}")
+            model.encoder, model.decoder = encoder, decoder
+
+    def _capture_encoder_graph(self, model):
+        """在GPU上为编码器捕获CUDA Graph，去掉内核启动开销"""
+        if not self.use_cuda or torch is None:
+            return
+
+        encoder = model.encoder
+        # 编码器使用自己的CUDA Graph，不再经过torch.compile
+        eager_encoder = getattr(encoder, "_orig_mod", encoder)
+        try:
+            model.encoder = CudaGraphEncoder(
+                eager_encoder,
+                n_mels=model.dims.n_mels,
+                dtype=torch.float16 if self.fp16 else torch.float32
+            )
+            print("✅ 编码器CUDA Graph捕获完成")
+        except Exception as e:
+            print(f"⚠️ CUDA Graph 捕获失败，使用普通编码器: {e}")
+            model.encoder = encoder
+
+    def transcribe(self, audio_np):
+        """调用Whisper识别（自动检测语言），返回 (文本, 语言代码)"""
+        return self._transcribe(self.model, audio_np)
+
+    def _transcribe(self, model, audio_np):
+        """使用指定模型识别，加载阶段预热时模型尚未就绪"""
+        if self.backend == "whisper.cpp":
+            segments = model.transcribe(audio_np, language="auto")
+            text = "".join(segment.text for segment in segments).strip()
+            return text, self._whisper_cpp_language(model)
+
+        if self.backend == "faster-whisper":
+            segments, info = model.transcribe(
+                audio_np,
+                language=None,  # 自动检测语言
+                vad_filter=False,
+                beam_size=1
+            )
+            text = "".join(segment.text for segment in segments).strip()
+            return text, info.language or "unknown"
+
+        result = model.transcribe(
+            audio_np,
+            fp16=self.fp16,
+            language=None  # 自动检测语言
+        )
+        return result["text"].strip(), result.get("language", "unknown")
+
+    def _whisper_cpp_language(self, model):
+        """读取whisper.cpp本次识别自动检测到的语言，失败时返回"unknown"并提示"""
+        # 直接读取识别上下文中的结果，避免auto_detect_language再跑一遍编码器
+        try:
+            import _pywhispercpp as pw
+            return pw.whisper_lang_str(pw.whisper_full_lang_id(model._ctx)) or "unknown"
+        except Exception as e:
+            print(f"⚠️ whisper.cpp 语言检测失败，按未知语言处理: {e}")
+            return "unknown"
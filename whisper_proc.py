@@ -0,0 +1,114 @@
+import queue
+import threading
+import multiprocessing as mp
+
+
+def run(in_q, out_q, model_size):
+    """子进程入口：加载模型一次，然后循环处理识别请求，收到None时退出"""
+    # 只在子进程中导入模型后端（torch/CTranslate2等），界面进程无需加载
+    from whisper_engine import WhisperEngine
+
+    engine = WhisperEngine(model_size)
+    try:
+        engine.load()
+    except Exception as e:
+        out_q.put(("error", str(e)))
+        return
+    out_q.put(("ready", engine.backend))
+
+    while True:
+        audio_np = in_q.get()
+        if audio_np is None:
+            break
+        try:
+            text, detected_language = engine.transcribe(audio_np)
+            out_q.put(("result", text, detected_language))
+        except Exception as e:
+            out_q.put(("error", str(e)))
+
+
+class WhisperProcess:
+    """Whisper子进程的代理 - 接口与WhisperEngine相同，识别请求通过队列发送到子进程"""
+
+    def __init__(self, model_size="base"):
+        self.model_size = model_size
+        self.backend = None
+        # spawn：避免fork带有CUDA/Qt线程状态的父进程
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.Lock()
+        self._ready = False
+        self._last_error = None
+        self._create_process()
+
+    def _create_process(self):
+        """创建新的子进程及其通信队列（尚未启动）"""
+        self._in_q = self._ctx.Queue()
+        self._out_q = self._ctx.Queue()
+        self._proc = self._ctx.Process(target=run, args=(self._in_q, self._out_q, self.model_size), daemon=True)
+
+    def start(self):
+        """启动子进程，模型在子进程中后台加载并预热"""
+        self._proc.start()
+
+    def is_loaded(self):
+        """模型是否已加载"""
+        return self._ready
+
+    def load(self):
+        """等待子进程中的模型加载完成，子进程已退出（加载失败/崩溃）时重新启动"""
+        with self._lock:
+            self._load()
+
+    def _load(self):
+        """load() 的实现，调用方需持有锁"""
+        if self._ready and self._proc.is_alive():
+            return
+        self._ready = False
+        if not self._proc.is_alive() and self._out_q.empty():
+            if self._last_error:
+                print(f"🔄 重新启动Whisper识别进程（上次错误: {self._last_error}）")
+            self._create_process()
+            self._proc.start()
+        message = self._receive()
+        if message[0] != "ready":
+            self._last_error = message[1]
+            raise RuntimeError(message[1])
+        self.backend = message[1]
+        self._ready = True
+        print(f"✅ Whisper识别进程就绪 ({self.backend})")
+
+    def transcribe(self, audio_np):
+        """发送音频到子进程识别，返回 (文本, 语言代码)；子进程崩溃后自动重启"""
+        with self._lock:
+            self._load()
+            self._in_q.put(audio_np)
+            message = self._receive()
+        if message[0] != "result":
+            self._last_error = message[1]
+            raise RuntimeError(message[1])
+        return message[1], message[2]
+
+    def _receive(self):
+        """等待子进程的下一条消息，子进程意外退出时抛出异常（附带上次错误原因）"""
+        while True:
+            try:
+                return self._out_q.get(timeout=1.0)
+            except queue.Empty:
+                if not self._proc.is_alive():
+                    self._ready = False
+                    message = f"Whisper识别进程已退出 (退出码: {self._proc.exitcode})"
+                    if self._last_error:
+                        message += f"，上次错误: {self._last_error}"
+                    else:
+                        self._last_error = message
+                    raise RuntimeError(message)
+
+    def stop(self, timeout=2.0):
+        """通知子进程退出，超时未退出则强制结束；timeout为0时直接结束，不等待"""
+        if not self._proc.is_alive():
+            return
+        if timeout > 0:
+            self._in_q.put(None)
+            self._proc.join(timeout)
+        if self._proc.is_alive():
+            self._proc.terminate()